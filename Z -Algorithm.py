@@ -1,9 +1,31 @@
+import numpy as np
+
+# Length of the longest common prefix of arr[a:] and arr[b:], capped at limit.
+# Only used once a run of matching characters reaches BLOCK: the rest of the run
+# is compared with NumPy in blocks of code points (starting at BLOCK and doubling)
+# instead of one Python-level comparison per character.
+BLOCK = 64
+
+def match_length(arr, a, b, limit):
+    matched = 0
+    block = BLOCK
+    while matched < limit:
+        k = min(block, limit - matched)
+        cmp = arr[a + matched:a + matched + k] != arr[b + matched:b + matched + k]
+        if cmp.any():
+            return matched + int(cmp.argmax())
+        matched += k
+        block *= 2
+    return matched
+
 def compute_z(s):
     n = len(s)
     if n == 0:
         return []
     Z = [0] * n
     Z[0] = n  # The entire string is the prefix itself
+    # One code point per element so slices line up with string indices.
+    arr = np.frombuffer(s.encode('utf-32-le'), dtype=np.uint32)
     l, r = 0, 0  # Window [l, r) that matches the prefix
     
     for i in range(1, n):
@@ -13,6 +35,9 @@ def compute_z(s):
             # Expand the window as long as characters match
             while r < n and s[r - l] == s[r]:
                 r += 1
+                if r - i == BLOCK:  # Long run: finish it block-wise with NumPy
+                    r += match_length(arr, r - l, r, n - r)
+                    break
             Z[i] = r - l  # Length of the match
             r -= 1  # Adjust r back to the end of the matched window
         else:
@@ -23,8 +48,12 @@ def compute_z(s):
             # Case 3: Need to expand the window starting from i
             else:
                 l = i  # Move the left end of the window to i
+                start = r
                 while r < n and s[r - l] == s[r]:
                     r += 1
+                    if r - start == BLOCK:  # Long run: finish it block-wise with NumPy
+                        r += match_length(arr, r - l, r, n - r)
+                        break
                 Z[i] = r - l
                 r -= 1  # Adjust r back after expansion
     return Z
@@ -1,3 +1,24 @@
+import numpy as np
+
+# Length of the longest common prefix of arr[a:] and arr[b:], capped at limit.
+# Only used once a run of matching characters reaches BLOCK: the rest of the run
+# is compared with NumPy in blocks of code points (starting at BLOCK and doubling)
+# instead of one Python-level comparison per character.
+BLOCK = 64
+
+def match_length(arr, a, b, limit):
+    matched = 0
+    block = BLOCK
+    while matched < limit:
+        k = min(block, limit - matched)
+        cmp = arr[a + matched:a + matched + k] != arr[b + matched:b + matched + k]
+        if cmp.any():
+            return matched + int(cmp.argmax())
+        matched += k
+        block *= 2
+    return matched
+
+
 def compute_Z(S):
     """
     Compute the Z-array for string S using the Z-algorithm.
@@ -11,15 +32,25 @@ def compute_Z(S):
     """
     n = len(S)
     Z = [0] * n
+    # One code point per element so slices line up with string indices.
+    arr = np.frombuffer(S.encode('utf-32-le'), dtype=np.uint32)
     l, r = 0, 0  # Left and right boundaries of the Z-box
 
     for i in range(1, n):
         if i <= r:  # Case 2: Inside a Z-box
             k = i - l
             Z[i] = min(r - i + 1, Z[k])  # Use previously computed Z-values
+            if Z[i] < r - i + 1:  # Ends inside the Z-box: no extension possible
+                continue
         
-        while i + Z[i] < n and S[Z[i]] == S[i + Z[i]]:  # Explicit comparison
-            Z[i] += 1
+        # Explicit comparison past the Z-box.
+        z = Z[i]
+        while i + z < n and S[z] == S[i + z]:
+            z += 1
+            if z - Z[i] == BLOCK:  # Long run: finish it block-wise with NumPy
+                z += match_length(arr, z, i + z, n - i - z)
+                break
+        Z[i] = z
         
         if i + Z[i] - 1 > r:  # Update Z-box boundaries
             l, r = i, i + Z[i] - 1
@@ -42,17 +73,15 @@ def pattern_matching_Z(text, pattern):
     concat_str = pattern + "&" + text
     
     # Step 2: Compute the Z-array
-    Z = compute_Z(concat_str)
+    Z = np.array(compute_Z(concat_str))
     
     # Step 3: Find pattern matches in the text
     pattern_length = len(pattern)
-    matches = []
-    
-    for i in range(pattern_length + 1, len(concat_str)):
-        if Z[i] == pattern_length:  # A full match occurs
-            matches.append(i - pattern_length - 1)  # Adjust index to text
+    # A full match occurs wherever Z equals the pattern length; slicing off
+    # the pattern and delimiter makes the indices relative to the text.
+    matches = np.where(Z[pattern_length + 1:] == pattern_length)[0]
     
-    return matches
+    return matches.tolist()
 
 
 # Example usage
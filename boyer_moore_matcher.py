@@ -1,4 +1,7 @@
+import os
 import sys
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 
 # Compute the Bad Character Table (stores rightmost positions of each character in pattern)
 def bad_character_table(pattern):
@@ -7,6 +10,14 @@ def bad_character_table(pattern):
         table[char] = i  # Store rightmost occurrence of each character
     return table
 
+# Bad Character Table for byte strings: a flat 256-entry list indexed by byte value
+# (-1 for bytes not in the pattern), so a lookup is a list index rather than a dict hash.
+def bad_character_array(pattern_bytes):
+    table = [-1] * 256
+    for i, byte in enumerate(pattern_bytes):
+        table[byte] = i  # Store rightmost occurrence of each byte
+    return table
+
 # Z-algorithm to compute Z-array (useful for good suffix and matched prefix computation)
 def z_algorithm(s):
     n = len(s)
@@ -52,8 +63,13 @@ def boyer_moore(text, pattern):
     positions = []  # Positions where pattern occurs
 
     # Preprocess pattern
-    bad_char = bad_character_table(pattern)
     gs, mp = good_suffix_table(pattern)
+    if text.isascii() and pattern.isascii():
+        # Encode once and search the bytes so each bad character lookup indexes a flat table.
+        text, pattern = text.encode(), pattern.encode()
+        bad_char = bad_character_array(pattern)
+    else:
+        bad_char = defaultdict(lambda: -1, bad_character_table(pattern))
 
     s = 0  # Current shift of the pattern over the text
     while s <= n - m:
@@ -65,7 +81,7 @@ def boyer_moore(text, pattern):
             shift = m - mp[1] if m > 1 else 1
             s += shift
         else:
-            bc_shift = j - bad_char.get(text[s + j], -1)
+            bc_shift = j - bad_char[text[s + j]]
             if gs[j + 1] > 0:
                 gs_shift = m - gs[j + 1]
             else:
@@ -74,6 +90,95 @@ def boyer_moore(text, pattern):
 
     return positions
 
+# Find all (possibly overlapping) occurrences using str.find, which runs in C.
+# The faster choice when the Boyer-Moore shift tables themselves are not of interest.
+def find_all(text, pattern):
+    positions = []
+    s = text.find(pattern)
+    while s != -1:
+        positions.append(s)
+        s = text.find(pattern, s + 1)
+    return positions
+
+# Text being searched in a worker process, set once per worker by _init_worker
+# so the full text is not pickled again with every pattern.
+_worker_text = None
+
+def _init_worker(text):
+    global _worker_text
+    _worker_text = text
+
+def _search_one(pattern):
+    return boyer_moore(_worker_text, pattern)
+
+# Run boyer_moore for every pattern against the same text, spreading the patterns
+# over a pool of worker processes. Returns one list of positions per pattern, in order.
+def search_patterns_parallel(text, patterns, max_workers=None):
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                             initializer=_init_worker, initargs=(text,)) as executor:
+        return list(executor.map(_search_one, patterns))
+
+# Build an Aho-Corasick automaton for a list of patterns.
+# goto[state] maps a character to the next trie state, fail[state] is the state for the
+# longest proper suffix of state's string that is also in the trie, and output[state]
+# lists the indices of the patterns that end at state (including via failure links).
+# Empty patterns are left out of the automaton; aho_corasick_search handles them.
+def build_aho_corasick(patterns):
+    goto = [{}]
+    output = [[]]
+    for index, pattern in enumerate(patterns):
+        if not pattern:
+            continue
+        state = 0
+        for char in pattern:
+            next_state = goto[state].get(char)
+            if next_state is None:
+                next_state = len(goto)
+                goto.append({})
+                output.append([])
+                goto[state][char] = next_state
+            state = next_state
+        output[state].append(index)
+
+    # Breadth-first over the trie so each failure link points to a shallower, finished state.
+    fail = [0] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for char, next_state in goto[state].items():
+            queue.append(next_state)
+            f = fail[state]
+            while f and char not in goto[f]:
+                f = fail[f]
+            fail[next_state] = goto[f].get(char, 0)
+            output[next_state] = output[next_state] + output[fail[next_state]]
+    return goto, fail, output
+
+# Find every pattern in a single pass over text with an Aho-Corasick automaton.
+# Returns one list of (possibly overlapping) positions per pattern, in order.
+# An empty pattern occurs at every position 0..len(text), as with find_all.
+def aho_corasick_search(text, patterns):
+    goto, fail, output = build_aho_corasick(patterns)
+    lengths = [len(pattern) for pattern in patterns]
+    positions = [[] if pattern else list(range(len(text) + 1)) for pattern in patterns]
+    state = 0
+    for end, char in enumerate(text):
+        while state and char not in goto[state]:
+            state = fail[state]
+        state = goto[state].get(char, 0)
+        for index in output[state]:
+            positions[index].append(end - lengths[index] + 1)
+    return positions
+
+# Search methods selectable from the command line. Each takes the text and the
+# list of patterns and returns one list of positions per pattern, in order.
+SEARCH_METHODS = {
+    "aho-corasick": aho_corasick_search,
+    "find": lambda text, patterns: [find_all(text, pattern) for pattern in patterns],
+    "boyer-moore": lambda text, patterns: [boyer_moore(text, pattern) for pattern in patterns],
+    "boyer-moore-parallel": search_patterns_parallel,
+}
+
 # Function to read contents from a file
 def read_file(filename):
     with open(filename, 'r', encoding='utf-8') as f:
@@ -81,19 +186,23 @@ def read_file(filename):
 
 # Main function to run from command line, processing multiple patterns
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python boyer_moore.py <text_file> <pattern_file>")
+    if len(sys.argv) not in (3, 4) or (len(sys.argv) == 4 and sys.argv[3] not in SEARCH_METHODS):
+        print("Usage: python boyer_moore.py <text_file> <pattern_file> [{}]".format("|".join(SEARCH_METHODS)))
         sys.exit(1)
 
     text_file, pattern_file = sys.argv[1], sys.argv[2]
+    method = sys.argv[3] if len(sys.argv) == 4 else "aho-corasick"
     text = read_file(text_file)
 
     # Process each pattern line separately
     with open(pattern_file, 'r', encoding='utf-8') as pf:
         patterns = [line.strip() for line in pf if line.strip()]
 
-    for pattern in patterns:
-        positions = boyer_moore(text, pattern)
+    # By default, search for all patterns at once in a single pass over the text;
+    # "find" uses str.find per pattern, "boyer-moore" the teaching implementation and
+    # "boyer-moore-parallel" runs it for the patterns across worker processes.
+    results = SEARCH_METHODS[method](text, patterns)
+    for pattern, positions in zip(patterns, results):
         print(f"Pattern '{pattern}' found at positions:", positions)
 
 if __name__ == "__main__":
@@ -1,21 +1,21 @@
 #!/usr/bin/env python3
 import sys
 
+from bwt_pattern_matching import build_suffix_array, build_bwt
+
 def construct_bwt(text):
     # Ensure the text ends with a unique terminal symbol.
     if not text.endswith('$'):
         text += '$'
-    n = len(text)
-    
-    # Generate all cyclic rotations of text.
-    # Each rotation is text[i:] + text[:i] for 0 <= i < n.
-    rotations = [text[i:] + text[:i] for i in range(n)]
     
-    # Sort the rotations lexicographically.
-    rotations.sort()
+    # With a unique terminal symbol, sorting the cyclic rotations
+    # text[i:] + text[:i] is the same as sorting the suffixes text[i:],
+    # so the suffix array gives the sorted rotations without building them.
+    sa = build_suffix_array(text)
     
-    # The BWT is the last character of each rotation in the sorted list.
-    bwt = ''.join(rotation[-1] for rotation in rotations)
+    # The BWT is the last character of each sorted rotation, i.e. the
+    # character just before each suffix (wrapping around for i = 0).
+    bwt = build_bwt(text, sa)
     return bwt
 
 def main():
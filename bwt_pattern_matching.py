@@ -1,81 +1,258 @@
 #!/usr/bin/env python3
 import sys
+from array import array
+import numpy as np
 
-def build_suffix_array(text):
+try:
+    # libdivsufsort binding: a C suffix sorter, used when installed.
+    from pydivsufsort import divsufsort
+except ImportError:
+    divsufsort = None
+
+def _induced_sort(s, upper):
     """
-    Naïvely build a suffix array by sorting all suffixes.
-    This has worst-case time complexity O(n^2 log n).
+    SA-IS on an integer sequence s whose values lie in [0, upper].
+    Follows the usual five steps: classify every position as S-type or L-type,
+    collect the LMS positions, induce-sort them into their buckets, recurse on
+    the reduced string of LMS-substring names, then induce-sort once more.
     """
-    n = len(text)
-    # Each suffix is identified by its starting index.
-    sa = sorted(range(n), key=lambda i: text[i:])
+    n = len(s)
+    if n == 0:
+        return array('i')
+    if n == 1:
+        return array('i', [0])
+    if n == 2:
+        return array('i', [0, 1] if s[0] < s[1] else [1, 0])
+
+    sa = array('i', [-1]) * n
+
+    # (1) Right-to-left scan: ls[i] is 1 if suffix i is S-type, 0 if L-type.
+    ls = bytearray(n)
+    for i in range(n-2, -1, -1):
+        ls[i] = ls[i+1] if s[i] == s[i+1] else s[i] < s[i+1]
+
+    # Bucket boundaries from cumulative counts: sum_l[c] is where the L-type
+    # part of bucket c starts, sum_s[c] is where its S-type part starts.
+    sum_l = array('i', [0]) * (upper + 2)
+    sum_s = array('i', [0]) * (upper + 2)
+    for i in range(n):
+        if not ls[i]:
+            sum_s[s[i]] += 1
+        else:
+            sum_l[s[i]+1] += 1
+    for c in range(upper + 1):
+        sum_s[c] += sum_l[c]
+        sum_l[c+1] += sum_s[c]
+
+    def induce(lms):
+        for i in range(n):
+            sa[i] = -1
+        # Place the LMS suffixes at the start of the S-part of their buckets.
+        buf = array('i', sum_s)
+        for d in lms:
+            if d == n:
+                continue
+            sa[buf[s[d]]] = d
+            buf[s[d]] += 1
+        # Induce L-type suffixes left to right.
+        buf = array('i', sum_l)
+        sa[buf[s[n-1]]] = n - 1
+        buf[s[n-1]] += 1
+        for i in range(n):
+            v = sa[i]
+            if v >= 1 and not ls[v-1]:
+                sa[buf[s[v-1]]] = v - 1
+                buf[s[v-1]] += 1
+        # Induce S-type suffixes right to left.
+        buf = array('i', sum_l)
+        for i in range(n-1, -1, -1):
+            v = sa[i]
+            if v >= 1 and ls[v-1]:
+                buf[s[v-1]+1] -= 1
+                sa[buf[s[v-1]+1]] = v - 1
+
+    # (2) LMS positions: S-type with an L-type left neighbour.
+    lms_map = array('i', [-1]) * (n + 1)
+    lms = array('i')
+    for i in range(1, n):
+        if not ls[i-1] and ls[i]:
+            lms_map[i] = len(lms)
+            lms.append(i)
+    m = len(lms)
+
+    # (3) Induced sort with the LMS positions in text order.
+    induce(lms)
+
+    if m:
+        # (4) Name the LMS substrings in sorted order and recurse on the names.
+        sorted_lms = array('i', [v for v in sa if lms_map[v] != -1])
+        rec_s = array('i', [0]) * m
+        rec_upper = 0
+        rec_s[lms_map[sorted_lms[0]]] = 0
+        for i in range(1, m):
+            l = sorted_lms[i-1]
+            r = sorted_lms[i]
+            end_l = lms[lms_map[l]+1] if lms_map[l] + 1 < m else n
+            end_r = lms[lms_map[r]+1] if lms_map[r] + 1 < m else n
+            same = True
+            if end_l - l != end_r - r:
+                same = False
+            else:
+                while l < end_l and s[l] == s[r]:
+                    l += 1
+                    r += 1
+                if l == n or s[l] != s[r]:
+                    same = False
+            if not same:
+                rec_upper += 1
+            rec_s[lms_map[sorted_lms[i]]] = rec_upper
+
+        rec_sa = _induced_sort(rec_s, rec_upper)
+        for i in range(m):
+            sorted_lms[i] = lms[rec_sa[i]]
+        # (5) Final induced sort from the correctly ordered LMS suffixes.
+        induce(sorted_lms)
     return sa
 
+def sais(text_bytes):
+    """
+    Build the suffix array of text_bytes (a bytes-like object) with SA-IS.
+    Runs in O(n) time for the byte alphabet.
+    """
+    return _induced_sort(text_bytes, 255)
+
+def build_suffix_array(text):
+    """
+    Build the suffix array of text in O(n) time, using libdivsufsort (via
+    pydivsufsort) when it is installed and the SA-IS implementation above otherwise.
+    ASCII text is encoded once and sorted as bytes. Other text is sorted by SA-IS
+    over the ranks of its characters (one integer per character), so suffix
+    indices still line up with text.
+    """
+    if not text.isascii():
+        alph = {ch: rank for rank, ch in enumerate(sorted(set(text)))}
+        return _induced_sort([alph[ch] for ch in text], len(alph) - 1)
+    text_bytes = text.encode()
+    if divsufsort is not None:
+        return divsufsort(text_bytes)
+    return sais(text_bytes)
+
 def build_bwt(text, sa):
     """
     Build the BWT using the suffix array.
     For each suffix starting at index i, the BWT character is text[i-1],
-    with wrap-around for i = 0.
+    with wrap-around for i = 0. Taking (i - 1) mod n handles the wrap-around
+    without a branch, so the whole column is a single NumPy gather.
+    Non-ASCII text is gathered as UTF-32 code points so indices match text.
     """
     n = len(text)
-    bwt_chars = []
-    for i in range(n):
-        pos = sa[i]
-        bwt_chars.append(text[pos-1] if pos != 0 else text[-1])
-    return ''.join(bwt_chars)
+    sa_arr = np.asarray(sa, dtype=np.int64)
+    encoding = 'ascii' if text.isascii() else 'utf-32-le'
+    dtype = np.uint8 if encoding == 'ascii' else np.dtype('<u4')
+    text_arr = np.frombuffer(text.encode(encoding), dtype=dtype)
+    bwt_arr = text_arr[(sa_arr - 1) % n]
+    return bwt_arr.tobytes().decode(encoding)
+
+# Number of BWT positions covered by each occurrence sample and bitmap word.
+OCC_BLOCK = 64
+
+def character_codes(text):
+    """
+    One integer code per character of text as a NumPy array: bytes for ASCII
+    text, UTF-32 code points otherwise, so indices always match text.
+    """
+    if text.isascii():
+        return np.frombuffer(text.encode(), dtype=np.uint8)
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.dtype('<u4'))
 
 def build_occurrence_table(bwt):
     """
-    Build an occurrence table for the BWT.
-    For each character in the alphabet, occ_table[ch][j] gives the number of times
-    ch appears in bwt[0:j] (j from 0 to n).
-    Since the alphabet is fixed-size, this takes O(n) time.
+    Build a sampled occurrence index for the BWT.
+    Rather than storing the count of every character at every position, counts
+    are sampled every OCC_BLOCK positions and the rest is recovered from bitmaps:
+      - occ_samples[r, k] is the number of times the character in row r appears
+        in bwt[0:k*OCC_BLOCK];
+      - occ_bitmaps[r, k] is a 64-bit word whose bits (most significant first)
+        mark the positions in block k holding that character.
+    Each distinct character gets a dense row, in sorted order. char_to_row maps
+    a character code to its row: for an ASCII BWT it is a 256-entry array (-1 if
+    the character does not occur), otherwise a dict keyed by code point.
+    Returns ((occ_samples, occ_bitmaps), char_to_row).
     """
     n = len(bwt)
+    num_blocks = (n + OCC_BLOCK - 1) // OCC_BLOCK
     # Determine alphabet from bwt
-    alph = sorted(set(bwt))
-    occ_table = {ch: [0]*(n+1) for ch in alph}
-    for j in range(n):
-        for ch in alph:
-            occ_table[ch][j+1] = occ_table[ch][j]
-        occ_table[bwt[j]][j+1] += 1
-    return occ_table
+    alph_codes, rows = np.unique(character_codes(bwt), return_inverse=True)
+    if bwt.isascii():
+        char_to_row = np.full(256, -1, dtype=np.int64)
+        char_to_row[alph_codes] = np.arange(len(alph_codes))
+    else:
+        char_to_row = {int(code): row for row, code in enumerate(alph_codes)}
+    # Row of each BWT position, padded to whole blocks with -1 (no character).
+    bwt_rows = np.full(num_blocks * OCC_BLOCK, -1, dtype=np.int64)
+    bwt_rows[:n] = rows
+
+    occ_samples = np.zeros((len(alph_codes), num_blocks + 1), dtype=np.uint32)
+    occ_bitmaps = np.zeros((len(alph_codes), num_blocks), dtype=np.uint64)
+    for row in range(len(alph_codes)):
+        is_ch = bwt_rows == row
+        np.cumsum(is_ch.reshape(num_blocks, OCC_BLOCK).sum(axis=1),
+                  dtype=np.uint32, out=occ_samples[row, 1:])
+        occ_bitmaps[row] = np.packbits(is_ch).view('>u8')
+    return (occ_samples, occ_bitmaps), char_to_row
+
+def rank(occ_table, row, pos):
+    """
+    Number of times the character in row appears in bwt[0:pos]: the sample at the
+    start of pos's block plus a popcount of the leading bits of the block's bitmap.
+    """
+    occ_samples, occ_bitmaps = occ_table
+    block, offset = divmod(pos, OCC_BLOCK)
+    count = int(occ_samples[row, block])
+    if offset:
+        count += (int(occ_bitmaps[row, block]) >> (OCC_BLOCK - offset)).bit_count()
+    return count
 
 def build_first_occurrence(bwt):
     """
-    Build a dictionary that maps each character to its first occurrence index in F,
-    the first column (i.e. sorted bwt).
+    Build an array that maps each character's row (as assigned by
+    build_occurrence_table) to its first occurrence index in F, the first
+    column (i.e. sorted bwt).
+    Rows follow sorted character order, so the first occurrence of a row is the
+    total count of all earlier rows.
     """
-    alph = sorted(set(bwt))
-    first_occ = {}
-    total = 0
-    for ch in alph:
-        first_occ[ch] = total
-        total += bwt.count(ch)
-    return first_occ
+    counts = np.unique(character_codes(bwt), return_counts=True)[1]
+    return np.cumsum(counts) - counts
 
-def backward_search(bwt, pattern, occ_table, first_occ):
+def backward_search(bwt, pattern, occ_table, char_to_row, first_occ):
     """
     Perform backward search on the BWT.
     Processes the pattern from right to left to find the interval [sp, ep] in the BWT
     (and thus in the suffix array) corresponding to the pattern.
     Runs in O(m) time for pattern length m.
+    Each pattern character is turned into an integer code once (a byte for an
+    ASCII BWT, a code point otherwise) and mapped to its row via char_to_row.
     Returns (sp, ep) or (-1, -1) if pattern is not found.
     """
     n = len(bwt)
-    m = len(pattern)
+    ascii_bwt = bwt.isascii()
+    # A non-ASCII pattern encodes to bytes >= 128, which never occur in an ASCII BWT.
+    pattern_codes = pattern.encode() if ascii_bwt else [ord(ch) for ch in pattern]
+    m = len(pattern_codes)
     sp = 0
     ep = n - 1
 
     # Process pattern from rightmost to leftmost character.
     for i in range(m-1, -1, -1):
-        ch = pattern[i]
-        if ch not in first_occ:
+        c = pattern_codes[i]
+        row = int(char_to_row[c]) if ascii_bwt else char_to_row.get(c, -1)
+        if row < 0:
             return -1, -1
+        c_first = int(first_occ[row])
         # Occurrence count up to sp (exclusive)
-        sp = first_occ[ch] + occ_table[ch][sp]
+        sp = c_first + rank(occ_table, row, sp)
         # Occurrence count up to ep (inclusive) 
-        ep = first_occ[ch] + occ_table[ch][ep+1] - 1
+        ep = c_first + rank(occ_table, row, ep+1) - 1
         if sp > ep:
             return -1, -1
     return sp, ep
@@ -98,17 +275,17 @@ def main():
     if not text.endswith('$'):
         text += '$'
 
-    # Construct the suffix array (naïve method).
+    # Construct the suffix array (libdivsufsort or SA-IS).
     sa = build_suffix_array(text)
     # Construct the BWT from the suffix array.
     bwt = build_bwt(text, sa)
 
     # Build auxiliary data structures for backward search.
-    occ_table = build_occurrence_table(bwt)
+    occ_table, char_to_row = build_occurrence_table(bwt)
     first_occ = build_first_occurrence(bwt)
 
     # Perform backward search to find the interval for the pattern.
-    sp, ep = backward_search(bwt, pattern, occ_table, first_occ)
+    sp, ep = backward_search(bwt, pattern, occ_table, char_to_row, first_occ)
 
     if sp == -1:
         print("Pattern not found in text.")
@@ -1,22 +1,72 @@
 #!/usr/bin/env python3
 import sys
-import heapq
+from collections import deque
 
-def elias_gamma_decode(bitstr, pos):
+class BitReader:
     """
-    Decodes an Elias gamma–encoded positive integer from bitstr starting at position pos.
-    Returns a tuple (value, new_pos).
+    Reads a bitstream from a bytes object, most significant bit first.
+    Bits are buffered in an integer that is refilled 8 bytes at a time with
+    int.from_bytes, so no string of '0'/'1' characters is ever built.
     """
-    zeros = 0
-    while pos < len(bitstr) and bitstr[pos] == '0':
-        zeros += 1
-        pos += 1
-    if pos + zeros > len(bitstr):
-        raise ValueError("Incomplete Elias gamma code in bitstream")
-    binary_value = bitstr[pos: pos + zeros + 1]
-    value = int(binary_value, 2)
-    pos += zeros + 1
-    return value, pos
+    def __init__(self, data):
+        self.data = data
+        self.byte_pos = 0  # Next byte of data to load into the buffer.
+        self.buf = 0
+        self.nbits = 0
+
+    def _refill(self):
+        """
+        Loads up to 8 more bytes into the buffer. Returns False at the end of data.
+        """
+        chunk = self.data[self.byte_pos: self.byte_pos + 8]
+        if not chunk:
+            return False
+        self.buf = (self.buf << (8 * len(chunk))) | int.from_bytes(chunk, "big")
+        self.nbits += 8 * len(chunk)
+        self.byte_pos += len(chunk)
+        return True
+
+    def read(self, k):
+        """
+        Reads the next k bits as an unsigned integer.
+        """
+        while self.nbits < k:
+            if not self._refill():
+                raise ValueError("Unexpected end of bitstream")
+        self.nbits -= k
+        value = self.buf >> self.nbits
+        self.buf &= (1 << self.nbits) - 1
+        return value
+
+    def skip_zeros(self):
+        """
+        Consumes bits up to (not including) the next 1 bit and returns how many were skipped.
+        The leading zeros of the buffer are counted with bit_length rather than bit by bit.
+        """
+        zeros = 0
+        while True:
+            if self.buf:
+                leading = self.nbits - self.buf.bit_length()
+                self.nbits -= leading
+                return zeros + leading
+            zeros += self.nbits
+            self.nbits = 0
+            if not self._refill():
+                raise ValueError("Incomplete Elias gamma code in bitstream")
+
+    def tell(self):
+        """
+        Returns the position of the next unread bit.
+        """
+        return 8 * self.byte_pos - self.nbits
+
+def elias_gamma_decode(reader):
+    """
+    Decodes an Elias gamma–encoded positive integer from the BitReader reader.
+    The L-1 leading zeros give the length of the L-bit binary value that follows.
+    """
+    zeros = reader.skip_zeros()
+    return reader.read(zeros + 1)
 
 class HuffmanNode:
     def __init__(self, freq, char=None, left=None, right=None):
@@ -27,55 +77,173 @@ class HuffmanNode:
 
 def build_huffman_tree(freq_dict):
     """
-    Builds the Huffman tree from the frequency dictionary.
-    Uses an increasing counter as a tie-breaker to ensure determinism.
+    Builds a Huffman tree from freq_dict (a dictionary mapping characters to frequencies)
+    with the two-queue method. Leaves are sorted by frequency once (ties keep the order
+    of freq_dict). Merged nodes are created in non-decreasing frequency order, so a second
+    FIFO queue stays sorted without a heap. On equal frequencies the leaf queue is taken
+    first, which keeps the tree deterministic.
+    Nodes are integer ids: leaves are 0..k-1 in sorted order, internal nodes follow.
+    Returns (root, left, right, chars) where left[i] and right[i] are the children of
+    node i (-1 for a leaf) and chars[i] is the character of leaf i.
     """
-    heap = []
-    count = 0
-    for char, f in freq_dict.items():
-        heap.append((f, count, HuffmanNode(f, char)))
-        count += 1
-    heapq.heapify(heap)
-    while len(heap) > 1:
-        f1, count1, left = heapq.heappop(heap)
-        f2, count2, right = heapq.heappop(heap)
-        new_node = HuffmanNode(f1 + f2, None, left, right)
-        heapq.heappush(heap, (new_node.freq, count, new_node))
-        count += 1
-    return heap[0][2]
+    leaves = sorted(freq_dict.items(), key=lambda item: item[1])
+    chars = [char for char, f in leaves]
+    freq = [f for char, f in leaves]
+    left = [-1] * len(leaves)
+    right = [-1] * len(leaves)
+    leaf_queue = deque(range(len(leaves)))
+    merged_queue = deque()
+
+    def pop_smallest():
+        if not merged_queue or (leaf_queue and freq[leaf_queue[0]] <= freq[merged_queue[0]]):
+            return leaf_queue.popleft()
+        return merged_queue.popleft()
+
+    while len(leaf_queue) + len(merged_queue) > 1:
+        first = pop_smallest()
+        second = pop_smallest()
+        freq.append(freq[first] + freq[second])
+        left.append(first)
+        right.append(second)
+        merged_queue.append(len(freq) - 1)
+    root = (leaf_queue or merged_queue)[0]
+    return root, left, right, chars
 
-def decode_payload(bitstr, pos, root, total_chars):
+def huffman_code_lengths(tree):
     """
-    Decodes the Huffman-encoded payload starting at bitstr[pos] using the Huffman tree.
-    Stops when total_chars characters have been decoded.
+    Walks the Huffman tree (as returned by build_huffman_tree) with an explicit stack
+    and returns a dictionary mapping each character to its code length (the depth of its leaf).
+    A tree with a single leaf still gets a 1-bit code.
     """
-    decoded_chars = []
-    node = root
-    while len(decoded_chars) < total_chars and pos < len(bitstr):
-        bit = bitstr[pos]
-        pos += 1
-        if bit == '0':
-            node = node.left
+    root, left, right, chars = tree
+    lengths = {}
+    stack = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if left[node] == -1:
+            lengths[chars[node]] = depth or 1
         else:
+            stack.append((right[node], depth + 1))
+            stack.append((left[node], depth + 1))
+    return lengths
+
+def build_canonical_codes(lengths):
+    """
+    Assigns canonical Huffman codes from the code lengths alone, exactly as the encoder does.
+    Characters are taken in (length, character) order and given consecutive codes,
+    shifting the next code left whenever the length increases.
+    Returns a dictionary mapping each character to (code, bit_length).
+    """
+    codebook = {}
+    code = 0
+    prev_length = 0
+    for length, char in sorted((length, char) for char, length in lengths.items()):
+        code <<= length - prev_length
+        codebook[char] = (code, length)
+        code += 1
+        prev_length = length
+    return codebook
+
+def build_decoding_tree(codebook):
+    """
+    Builds a binary tree whose leaves are reached by following each character's code
+    (0 = left, 1 = right). A single character is returned as a lone leaf.
+    """
+    if len(codebook) == 1:
+        (char,) = codebook
+        return HuffmanNode(0, char)
+    root = HuffmanNode(0)
+    for char, (code, length) in codebook.items():
+        node = root
+        for shift in range(length - 1, -1, -1):
+            if (code >> shift) & 1:
+                if node.right is None:
+                    node.right = HuffmanNode(0)
+                node = node.right
+            else:
+                if node.left is None:
+                    node.left = HuffmanNode(0)
+                node = node.left
+        node.char = char
+    return root
+
+def walk_bits(node, root, value, nbits):
+    """
+    Follows the nbits low-order bits of value (most significant first) down the
+    Huffman tree starting at node, restarting at root after each decoded leaf.
+    Returns (decoded_chars, node) where node is the internal node reached at the end.
+    """
+    decoded_chars = []
+    for shift in range(nbits - 1, -1, -1):
+        if (value >> shift) & 1:
             node = node.right
-        if node is None:
-            break  # Likely reached padding.
+        else:
+            node = node.left
         if node.char is not None:
             decoded_chars.append(node.char)
             node = root
-    if len(decoded_chars) != total_chars:
-        raise ValueError("Decoded character count does not match expected total. " +
-                         f"Expected {total_chars}, got {len(decoded_chars)}.")
-    return "".join(decoded_chars), pos
+    return "".join(decoded_chars), node
 
-def unpack_bytes(byte_data):
+def build_decode_table(root):
     """
-    Converts byte_data (a bytes object) to a string of bits.
+    Builds a table for decoding the payload a byte at a time.
+    The states are the internal nodes of the tree, numbered in BFS order (root is 0).
+    table[state * 256 + byte] is (chars, next_base): the characters emitted while
+    following the 8 bits of byte from that state, and next_state * 256 for the
+    internal node reached afterwards.
+    Returns (table, state_of) where state_of maps each internal node to its state.
     """
-    bits = ""
-    for byte in byte_data:
-        bits += format(byte, "08b")
-    return bits
+    state_of = {}
+    internal_nodes = []
+    queue = deque([root])
+    while queue:
+        node = queue.popleft()
+        if node.char is None:
+            state_of[node] = len(internal_nodes)
+            internal_nodes.append(node)
+            queue.append(node.left)
+            queue.append(node.right)
+
+    table = []
+    for node in internal_nodes:
+        for byte in range(256):
+            chars, end_node = walk_bits(node, root, byte, 8)
+            table.append((chars, state_of[end_node] * 256))
+    return table, state_of
+
+def decode_payload(byte_data, pos, root, total_chars):
+    """
+    Decodes the Huffman-encoded payload starting at bit position pos of byte_data.
+    Any bits before the next byte boundary are walked through the tree one at a time;
+    the remaining bytes are decoded 8 bits per step with the table from build_decode_table.
+    Characters decoded from the zero padding in the last byte are discarded.
+    """
+    if root.char is not None:
+        # A single distinct character is coded with one bit per occurrence.
+        if len(byte_data) * 8 - pos < total_chars:
+            raise ValueError("Decoded character count does not match expected total. " +
+                             f"Expected {total_chars}.")
+        return root.char * total_chars
+
+    table, state_of = build_decode_table(root)
+    byte_index, offset = divmod(pos, 8)
+    chunks = []
+    node = root
+    if offset and byte_index < len(byte_data):
+        chars, node = walk_bits(root, root, byte_data[byte_index], 8 - offset)
+        chunks.append(chars)
+        byte_index += 1
+
+    base = state_of[node] * 256
+    for byte in memoryview(byte_data)[byte_index:]:
+        chars, base = table[base + byte]
+        chunks.append(chars)
+
+    decoded_text = "".join(chunks)
+    if len(decoded_text) < total_chars:
+        raise ValueError("Decoded character count does not match expected total. " +
+                         f"Expected {total_chars}, got {len(decoded_text)}.")
+    return decoded_text[:total_chars]
 
 def main():
     if len(sys.argv) != 3:
@@ -85,31 +253,32 @@ def main():
     input_filename = sys.argv[1]
     output_filename = sys.argv[2]
     
-    # Read the binary file and convert it to a bit string.
+    # Read the binary file and read the header from it bit by bit.
     with open(input_filename, "rb") as infile:
         byte_data = infile.read()
-    bitstr = unpack_bytes(byte_data)
+    reader = BitReader(byte_data)
     
-    pos = 0
     # (a) Decode the number of unique characters.
-    num_unique, pos = elias_gamma_decode(bitstr, pos)
+    num_unique = elias_gamma_decode(reader)
     
     # (b) For each unique character, decode frequency and then read 8 bits for the ASCII code.
     freq_dict = {}
     for _ in range(num_unique):
-        freq, pos = elias_gamma_decode(bitstr, pos)
-        ascii_code = bitstr[pos: pos+8]
-        pos += 8
-        char = chr(int(ascii_code, 2))
+        freq = elias_gamma_decode(reader)
+        char = chr(reader.read(8))
         freq_dict[char] = freq
     # (c) Decode the total number of characters.
-    total_chars, pos = elias_gamma_decode(bitstr, pos)
+    total_chars = elias_gamma_decode(reader)
+    pos = reader.tell()
     
-    # Rebuild the Huffman tree.
-    huffman_root = build_huffman_tree(freq_dict)
+    # Rebuild the Huffman tree, take its code lengths and rebuild the
+    # canonical codes the encoder used.
+    huffman_tree = build_huffman_tree(freq_dict)
+    codebook = build_canonical_codes(huffman_code_lengths(huffman_tree))
+    huffman_root = build_decoding_tree(codebook)
     
     # Decode the payload.
-    decoded_text, pos = decode_payload(bitstr, pos, huffman_root, total_chars)
+    decoded_text = decode_payload(byte_data, pos, huffman_root, total_chars)
     
     with open(output_filename, "w", encoding="ascii") as outfile:
         outfile.write(decoded_text)
@@ -1,7 +1,37 @@
 #!/usr/bin/env python3
 import sys
-import heapq
-from collections import Counter
+from collections import Counter, deque
+
+class BitWriter:
+    """
+    Accumulates a bitstream into a bytearray.
+    Bits are collected in an integer buffer and flushed a whole byte at a time,
+    so no intermediate string of '0'/'1' characters is ever built.
+    """
+    def __init__(self):
+        self.buf = 0
+        self.nbits = 0
+        self.out = bytearray()
+
+    def write(self, bits, n):
+        """
+        Appends the n low-order bits of bits, most significant bit first.
+        """
+        self.buf = (self.buf << n) | bits
+        self.nbits += n
+        while self.nbits >= 8:
+            self.nbits -= 8
+            self.out.append((self.buf >> self.nbits) & 0xFF)
+        self.buf &= (1 << self.nbits) - 1
+
+    def flush_padded(self):
+        """
+        Pads the final partial byte with zeros and appends it to out.
+        """
+        if self.nbits:
+            self.out.append((self.buf << (8 - self.nbits)) & 0xFF)
+            self.buf = 0
+            self.nbits = 0
 
 def elias_gamma_encode(n):
     """
@@ -11,68 +41,97 @@ def elias_gamma_encode(n):
     For example:
       n = 1  -> binary "1" (L=1)  -> output "1"
       n = 5  -> binary "101" (L=3) -> output "00" + "101" = "00101"
+    Writing n in 2L-1 bits produces exactly those L-1 leading zeros, so the code
+    is returned as (value, total_bits) ready for BitWriter.write.
     """
     if n < 1:
         raise ValueError("Elias gamma encoding is only defined for positive integers")
-    b = bin(n)[2:]
-    L = len(b)
-    return "0" * (L - 1) + b
-
-class HuffmanNode:
-    def __init__(self, freq, char=None, left=None, right=None):
-        self.freq = freq
-        self.char = char
-        self.left = left
-        self.right = right
+    return n, 2 * n.bit_length() - 1
 
 def build_huffman_tree(freq_dict):
     """
-    Builds a Huffman tree from freq_dict (a dictionary mapping characters to frequencies).
-    Uses an increasing counter as a tie-breaker to guarantee a deterministic tree.
+    Builds a Huffman tree from freq_dict (a dictionary mapping characters to frequencies)
+    with the two-queue method. Leaves are sorted by frequency once (ties keep the order
+    of freq_dict). Merged nodes are created in non-decreasing frequency order, so a second
+    FIFO queue stays sorted without a heap. On equal frequencies the leaf queue is taken
+    first, which keeps the tree deterministic.
+    Nodes are integer ids: leaves are 0..k-1 in sorted order, internal nodes follow.
+    Returns (root, left, right, chars) where left[i] and right[i] are the children of
+    node i (-1 for a leaf) and chars[i] is the character of leaf i.
+    """
+    leaves = sorted(freq_dict.items(), key=lambda item: item[1])
+    chars = [char for char, f in leaves]
+    freq = [f for char, f in leaves]
+    left = [-1] * len(leaves)
+    right = [-1] * len(leaves)
+    leaf_queue = deque(range(len(leaves)))
+    merged_queue = deque()
+
+    def pop_smallest():
+        if not merged_queue or (leaf_queue and freq[leaf_queue[0]] <= freq[merged_queue[0]]):
+            return leaf_queue.popleft()
+        return merged_queue.popleft()
+
+    while len(leaf_queue) + len(merged_queue) > 1:
+        first = pop_smallest()
+        second = pop_smallest()
+        freq.append(freq[first] + freq[second])
+        left.append(first)
+        right.append(second)
+        merged_queue.append(len(freq) - 1)
+    root = (leaf_queue or merged_queue)[0]
+    return root, left, right, chars
+
+def huffman_code_lengths(tree):
+    """
+    Walks the Huffman tree (as returned by build_huffman_tree) with an explicit stack
+    and returns a dictionary mapping each character to its code length (the depth of its leaf).
+    A tree with a single leaf still gets a 1-bit code.
     """
-    heap = []
-    count = 0
-    for char, f in freq_dict.items():
-        heap.append((f, count, HuffmanNode(f, char)))
-        count += 1
-    heapq.heapify(heap)
-    while len(heap) > 1:
-        f1, count1, left = heapq.heappop(heap)
-        f2, count2, right = heapq.heappop(heap)
-        new_node = HuffmanNode(f1 + f2, None, left, right)
-        heapq.heappush(heap, (new_node.freq, count, new_node))
-        count += 1
-    return heap[0][2]
+    root, left, right, chars = tree
+    lengths = {}
+    stack = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if left[node] == -1:
+            lengths[chars[node]] = depth or 1
+        else:
+            stack.append((right[node], depth + 1))
+            stack.append((left[node], depth + 1))
+    return lengths
 
-def build_huffman_codes(node, prefix="", codebook=None):
+def build_canonical_codes(lengths):
     """
-    Recursively builds a dictionary mapping each character to its Huffman code.
+    Assigns canonical Huffman codes from the code lengths alone.
+    Characters are taken in (length, character) order and given consecutive codes,
+    shifting the next code left whenever the length increases.
+    Returns a dictionary mapping each character to (code, bit_length).
     """
-    if codebook is None:
-        codebook = {}
-    if node.char is not None:
-        codebook[node.char] = prefix or "0"
-    else:
-        build_huffman_codes(node.left, prefix + "0", codebook)
-        build_huffman_codes(node.right, prefix + "1", codebook)
+    codebook = {}
+    code = 0
+    prev_length = 0
+    for length, char in sorted((length, char) for char, length in lengths.items()):
+        code <<= length - prev_length
+        codebook[char] = (code, length)
+        code += 1
+        prev_length = length
     return codebook
 
-def text_to_bitstring(text, codebook):
+def build_huffman_codes(tree):
     """
-    Converts the text into a bit string by concatenating the Huffman code for each character.
+    Builds a dictionary mapping each character to its canonical Huffman code,
+    stored as a (code, bit_length) pair with the bits held in an integer.
+    Only the code lengths are taken from the tree.
     """
-    return "".join(codebook[char] for char in text)
+    return build_canonical_codes(huffman_code_lengths(tree))
 
-def pack_bits(bitstring):
+def encode_text(text, codebook, writer):
     """
-    Pads bitstring with zeros (if necessary) so its length is a multiple of 8, and packs it into bytes.
+    Writes the Huffman code for each character of text to writer.
     """
-    num_extra = (8 - len(bitstring) % 8) % 8
-    bitstring += "0" * num_extra
-    byte_array = bytearray()
-    for i in range(0, len(bitstring), 8):
-        byte_array.append(int(bitstring[i:i+8], 2))
-    return bytes(byte_array)
+    write = writer.write
+    for char in text:
+        write(*codebook[char])
 
 def main():
     if len(sys.argv) != 3:
@@ -89,35 +148,35 @@ def main():
     # Build the Huffman tree and codebook.
     huffman_tree = build_huffman_tree(freq)
     codebook = build_huffman_codes(huffman_tree)
-    encoded_text = text_to_bitstring(text, codebook)
     
     # Build the header using Elias gamma coding.
-    header = ""
+    writer = BitWriter()
     
     # (a) Write the number of unique characters.
     unique_chars = len(freq)
-    header += elias_gamma_encode(unique_chars)
+    writer.write(*elias_gamma_encode(unique_chars))
     
     # (b) For each distinct character—in the order of first appearance (Counter preserves insertion order):
     for char in freq:
-        header += elias_gamma_encode(freq[char])
-        header += format(ord(char), "08b")  # 8-bit ASCII code.
+        writer.write(*elias_gamma_encode(freq[char]))
+        writer.write(ord(char), 8)  # 8-bit ASCII code.
     
     # (c) Write the total number of characters.
     total_chars = len(text)
-    header += elias_gamma_encode(total_chars)
+    writer.write(*elias_gamma_encode(total_chars))
     
     # (d) Append the Huffman-encoded payload.
-    full_bitstring = header + encoded_text
+    encode_text(text, codebook, writer)
     
-    # Pack bits into bytes and write to the output file.
-    output_bytes = pack_bits(full_bitstring)
+    # Pad the last byte and write the packed bytes straight from the writer's buffer.
+    writer.flush_padded()
     with open(output_filename, "wb") as outfile:
-        outfile.write(output_bytes)
+        outfile.write(writer.out)
     
     print("Encoding complete.")
     print("Unique characters:", unique_chars)
-    print("Huffman Codes:", codebook)
+    print("Huffman Codes:", {char: format(code, "0{}b".format(length))
+                             for char, (code, length) in codebook.items()})
 
 if __name__ == "__main__":
     main()
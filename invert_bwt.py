@@ -1,42 +1,60 @@
 #!/usr/bin/env python3
 import sys
+import numpy as np
+
+try:
+    # Numba compiles the LF walk to machine code when it is installed.
+    from numba import njit
+except ImportError:
+    njit = None
+
+def lf_walk(symbols, ranks, first_occ, row, out):
+    # Follow the LF mapping len(out) times from row, storing each symbol in out.
+    # At each step, LF(row) = first_occ[bwt[row]] + ranks[row].
+    for i in range(len(out)):
+        symbol = symbols[row]
+        out[i] = symbol
+        row = first_occ[symbol] + ranks[row]
+    return out
+
+if njit is not None:
+    lf_walk = njit(lf_walk)
 
 def invert_bwt(bwt):
     n = len(bwt)
+    # Work on the code points of the BWT (one per character, so indices match bwt),
+    # then replace each with its rank in the sorted alphabet: symbols[i] is the rank of bwt[i].
+    bwt_arr = np.frombuffer(bwt.encode('utf-32-le'), dtype=np.dtype('<u4'))
+    codes, symbols, count = np.unique(bwt_arr, return_inverse=True, return_counts=True)
+    symbols = symbols.astype(np.int64)
+
+    # Build first_occ, which maps each symbol to its first occurrence in F.
+    # F is the first column of the sorted rotations (i.e. sorted(bwt)).
+    first_occ = count.cumsum() - count
+
     # Compute rank for each character in bwt.
     # For each position i, ranks[i] is the number of occurrences of bwt[i]
-    # seen so far (starting at 0).
-    ranks = [0] * n
-    count = {}  # count for each character
-    for i, ch in enumerate(bwt):
-        if ch not in count:
-            count[ch] = 0
-        ranks[i] = count[ch]
-        count[ch] += 1
-
-    # Build a dictionary first_occ that maps each character to its first occurrence in F.
-    # F is the first column of the sorted rotations (i.e. sorted(bwt)).
-    first_occ = {}
-    total = 0
-    for ch in sorted(count.keys()):
-        first_occ[ch] = total
-        total += count[ch]
+    # seen so far (starting at 0). A stable sort lists positions grouped by symbol
+    # and in text order within each group, so sorted position k is the
+    # (k - first_occ[symbol])-th occurrence of its symbol.
+    order = np.argsort(symbols, kind='stable')
+    ranks = np.empty(n, dtype=np.int64)
+    ranks[order] = np.arange(n) - first_occ[symbols[order]]
 
     # Find the row that contains the terminal symbol "$".
     row = bwt.index('$')
 
     # Reconstruct the original text by following the LF mapping.
-    # At each step, LF(row) = first_occ[bwt[row]] + ranks[row].
     # We do this n times (where n = len(bwt)) to recover all characters.
-    result = []
-    for i in range(n):
-        ch = bwt[row]
-        result.append(ch)
-        row = first_occ[ch] + ranks[row]
+    if njit is not None:
+        result = lf_walk(symbols, ranks, first_occ, row, np.empty(n, dtype=np.int64))
+    else:
+        # Without Numba, plain lists index much faster than NumPy arrays.
+        result = lf_walk(symbols.tolist(), ranks.tolist(), first_occ.tolist(), row, [0] * n)
 
     # The result is built in reverse (it ends at the terminal "$").
-    # Reverse it to get the original string.
-    original = ''.join(result[::-1])
+    # Reverse it and map the symbols back to characters to get the original string.
+    original = codes[np.asarray(result, dtype=np.int64)[::-1]].tobytes().decode('utf-32-le')
     return original
 
 def main():
@@ -1,7 +1,8 @@
-import matplotlib.pyplot as plt
-import networkx as nx
-
 class SuffixTreeNode:
+    # Fixed attribute slots: no per-node __dict__, and faster attribute access
+    # in the construction loop.
+    __slots__ = ('children', 'suffix_link', 'start', 'end', 'is_leaf', 'index')
+
     def __init__(self, start, end):
         # Mapping from character to child node.
         self.children = {}
@@ -10,12 +11,14 @@ class SuffixTreeNode:
         # Edge label is represented as start and end indices (end can be a pointer for leaves).
         self.start = start  
         self.end = end      # For leaves, end is a mutable one-element list.
+        # Flag leaves once instead of checking the type of end on every access.
+        self.is_leaf = isinstance(end, list)
         # For further processing or debugging (e.g. storing suffix index).
         self.index = -1     
 
     def edge_length(self, current_pos):
         # Compute edge length. For leaves, end is a mutable pointer.
-        if isinstance(self.end, list):
+        if self.is_leaf:
             return self.end[0] - self.start + 1
         return self.end - self.start + 1
 
@@ -54,59 +57,79 @@ class SuffixTree:
     def _extend_suffix_tree(self, pos):
         # ********** Phase pos **********
         # Extend the tree with self.text[pos]
-        self.leaf_end[0] = pos  # Rapid leaf extension update.
-        self.remaining_suffix_count += 1
-        self.last_new_node = None
+        # The active point and other state are kept in locals for the duration
+        # of the phase and written back at the end; attribute loads on self
+        # would otherwise dominate the loop.
+        text = self.text
+        root = self.root
+        leaf_end = self.leaf_end
+        leaf_end[0] = pos  # Rapid leaf extension update.
+        current_end_char = text[pos]
+        active_node = self.active_node
+        active_edge = self.active_edge
+        active_length = self.active_length
+        remaining_suffix_count = self.remaining_suffix_count + 1
+        last_new_node = None
 
-        while self.remaining_suffix_count > 0:
-            if self.active_length == 0:
-                self.active_edge = pos
+        while remaining_suffix_count > 0:
+            if active_length == 0:
+                active_edge = pos
 
-            current_char = self.text[self.active_edge]
-            if current_char not in self.active_node.children:
+            current_char = text[active_edge]
+            children = active_node.children
+            next_node = children.get(current_char)
+            if next_node is None:
                 # Rule 2: Create a new leaf node.
-                self.active_node.children[current_char] = SuffixTreeNode(pos, self.leaf_end)
+                children[current_char] = SuffixTreeNode(pos, leaf_end)
                 # Rule 3: If an internal node was created in the previous extension, set its suffix link.
-                if self.last_new_node is not None:
-                    self.last_new_node.suffix_link = self.active_node
-                    self.last_new_node = None
+                if last_new_node is not None:
+                    last_new_node.suffix_link = active_node
+                    last_new_node = None
             else:
-                next_node = self.active_node.children[current_char]
-                edge_length = next_node.edge_length(pos)
-                if self.active_length >= edge_length:
+                if next_node.is_leaf:
+                    edge_length = leaf_end[0] - next_node.start + 1
+                else:
+                    edge_length = next_node.end - next_node.start + 1
+                if active_length >= edge_length:
                     # Skip/count trick: skip the entire edge.
-                    self.active_edge += edge_length
-                    self.active_length -= edge_length
-                    self.active_node = next_node
+                    active_edge += edge_length
+                    active_length -= edge_length
+                    active_node = next_node
                     continue
 
                 # If the next character on the edge matches, do a premature stop.
-                if self.text[next_node.start + self.active_length] == self.text[pos]:
-                    if self.last_new_node is not None and self.active_node != self.root:
-                        self.last_new_node.suffix_link = self.active_node
-                        self.last_new_node = None
-                    self.active_length += 1
+                if text[next_node.start + active_length] == current_end_char:
+                    if last_new_node is not None and active_node is not root:
+                        last_new_node.suffix_link = active_node
+                        last_new_node = None
+                    active_length += 1
                     break
 
                 # Rule 2 (split edge): Split the edge and insert a new internal node.
-                split_end = next_node.start + self.active_length - 1
+                split_end = next_node.start + active_length - 1
                 split_node = SuffixTreeNode(next_node.start, split_end)
-                self.active_node.children[current_char] = split_node
-                split_node.children[self.text[pos]] = SuffixTreeNode(pos, self.leaf_end)
-                next_node.start += self.active_length
-                split_node.children[self.text[next_node.start]] = next_node
+                children[current_char] = split_node
+                split_node.children[current_end_char] = SuffixTreeNode(pos, leaf_end)
+                next_node.start += active_length
+                split_node.children[text[next_node.start]] = next_node
+
+                if last_new_node is not None:
+                    last_new_node.suffix_link = split_node
+                last_new_node = split_node
 
-                if self.last_new_node is not None:
-                    self.last_new_node.suffix_link = split_node
-                self.last_new_node = split_node
+            remaining_suffix_count -= 1
 
-            self.remaining_suffix_count -= 1
+            if active_node is root and active_length > 0:
+                active_length -= 1
+                active_edge = pos - remaining_suffix_count + 1
+            elif active_node is not root:
+                active_node = active_node.suffix_link if active_node.suffix_link is not None else root
 
-            if self.active_node == self.root and self.active_length > 0:
-                self.active_length -= 1
-                self.active_edge = pos - self.remaining_suffix_count + 1
-            elif self.active_node != self.root:
-                self.active_node = self.active_node.suffix_link if self.active_node.suffix_link is not None else self.root
+        self.active_node = active_node
+        self.active_edge = active_edge
+        self.active_length = active_length
+        self.remaining_suffix_count = remaining_suffix_count
+        self.last_new_node = last_new_node
 
     def make_explicit(self):
         """
@@ -138,7 +161,7 @@ class SuffixTree:
         (Optional) Utility method to print the suffix tree edges.
         """
         for child in node.children.values():
-            end_index = child.end[0] if isinstance(child.end, list) else child.end
+            end_index = child.end[0] if child.is_leaf else child.end
             edge_label = self.text[child.start: end_index + 1]
             print(' ' * indent + edge_label)
             self._print_tree(child, indent + 4)
@@ -147,7 +170,11 @@ class SuffixTree:
         """
         Visualization of the suffix tree using NetworkX and Matplotlib.
         Each node is assigned a unique ID. Edge labels show the substring (via start and end indices).
+        NetworkX and Matplotlib are imported here so building a tree does not load them.
         """
+        import matplotlib.pyplot as plt
+        import networkx as nx
+
         G = nx.DiGraph()
         node_labels = {}
         edge_labels = {}
@@ -162,7 +189,7 @@ class SuffixTree:
             node_labels[current_id] = f"{current_id}" if node.index == -1 else f"{current_id}\n({node.index})"
             for child in node.children.values():
                 child_id = dfs(child)
-                if isinstance(child.end, list):
+                if child.is_leaf:
                     end_index = child.end[0]
                 else:
                     end_index = child.end
@@ -187,6 +214,149 @@ class SuffixTree:
         plt.show()
 
 
+def _extend_flat_suffix_tree(text, pos, start, end, is_leaf, suffix_link,
+                             first_child, next_sibling, state):
+    """
+    One phase of Ukkonen's algorithm on the flat-array tree built by
+    build_flat_suffix_tree; mirrors SuffixTree._extend_suffix_tree.
+    Node 0 is the root. Children of a node form a linked list through
+    first_child/next_sibling and are told apart by the first character of their
+    edge. Leaves are flagged in is_leaf and all end at the current phase (pos),
+    so they need no end value of their own. state holds
+    [active_node, active_edge, active_length, remaining_suffix_count, num_nodes]
+    and is updated in place.
+    """
+    active_node = state[0]
+    active_edge = state[1]
+    active_length = state[2]
+    remaining_suffix_count = state[3] + 1
+    num_nodes = state[4]
+    current_end_char = text[pos]
+    last_new_node = -1
+
+    while remaining_suffix_count > 0:
+        if active_length == 0:
+            active_edge = pos
+
+        current_char = text[active_edge]
+        prev = -1
+        child = first_child[active_node]
+        while child != -1 and text[start[child]] != current_char:
+            prev = child
+            child = next_sibling[child]
+
+        if child == -1:
+            # Rule 2: Create a new leaf node.
+            leaf = num_nodes
+            num_nodes += 1
+            start[leaf] = pos
+            is_leaf[leaf] = True
+            next_sibling[leaf] = first_child[active_node]
+            first_child[active_node] = leaf
+            # Rule 3: If an internal node was created in the previous extension, set its suffix link.
+            if last_new_node != -1:
+                suffix_link[last_new_node] = active_node
+                last_new_node = -1
+        else:
+            edge_end = pos if is_leaf[child] else end[child]
+            edge_length = edge_end - start[child] + 1
+            if active_length >= edge_length:
+                # Skip/count trick: skip the entire edge.
+                active_edge += edge_length
+                active_length -= edge_length
+                active_node = child
+                continue
+
+            # If the next character on the edge matches, do a premature stop.
+            if text[start[child] + active_length] == current_end_char:
+                if last_new_node != -1 and active_node != 0:
+                    suffix_link[last_new_node] = active_node
+                    last_new_node = -1
+                active_length += 1
+                break
+
+            # Rule 2 (split edge): Split the edge and insert a new internal node
+            # in the child's place among active_node's children.
+            split_node = num_nodes
+            num_nodes += 1
+            start[split_node] = start[child]
+            end[split_node] = start[child] + active_length - 1
+            next_sibling[split_node] = next_sibling[child]
+            if prev == -1:
+                first_child[active_node] = split_node
+            else:
+                next_sibling[prev] = split_node
+
+            leaf = num_nodes
+            num_nodes += 1
+            start[leaf] = pos
+            is_leaf[leaf] = True
+            start[child] += active_length
+            first_child[split_node] = child
+            next_sibling[child] = leaf
+            next_sibling[leaf] = -1
+
+            if last_new_node != -1:
+                suffix_link[last_new_node] = split_node
+            last_new_node = split_node
+
+        remaining_suffix_count -= 1
+
+        if active_node == 0 and active_length > 0:
+            active_length -= 1
+            active_edge = pos - remaining_suffix_count + 1
+        elif active_node != 0:
+            active_node = suffix_link[active_node] if suffix_link[active_node] != -1 else 0
+
+    state[0] = active_node
+    state[1] = active_edge
+    state[2] = active_length
+    state[3] = remaining_suffix_count
+    state[4] = num_nodes
+
+# Phase function used by build_flat_suffix_tree: compiled by Numba on first use
+# when it is installed, so importing this module never loads NumPy or Numba.
+_flat_extend = None
+
+
+def build_flat_suffix_tree(text):
+    """
+    Builds the suffix tree of text (assumed ASCII) with Ukkonen's algorithm on
+    flat NumPy arrays instead of SuffixTreeNode objects, so that each phase can
+    be compiled by Numba when it is installed. Append a unique terminal symbol
+    such as '$' to text for an explicit tree.
+    Returns (start, end, is_leaf, suffix_link, first_child, next_sibling, num_nodes):
+    arrays indexed by node id (root is 0) and the number of nodes used.
+    A leaf's edge ends at the last index of text; other edges end at end[node].
+    """
+    global _flat_extend
+    import numpy as np
+    if _flat_extend is None:
+        try:
+            from numba import njit
+            _flat_extend = njit(_extend_flat_suffix_tree)
+        except ImportError:
+            _flat_extend = _extend_flat_suffix_tree
+
+    text_arr = np.frombuffer(text.encode(), dtype=np.uint8)
+    # A suffix tree over n characters has at most 2n nodes, plus the root.
+    max_nodes = 2 * len(text_arr) + 1
+    start = np.full(max_nodes, -1, dtype=np.int64)
+    end = np.full(max_nodes, -1, dtype=np.int64)
+    is_leaf = np.zeros(max_nodes, dtype=np.bool_)
+    suffix_link = np.full(max_nodes, -1, dtype=np.int64)
+    first_child = np.full(max_nodes, -1, dtype=np.int64)
+    next_sibling = np.full(max_nodes, -1, dtype=np.int64)
+    suffix_link[0] = 0  # Suffix link of root points to itself.
+
+    # Active point (node 0, edge -1, length 0), no pending suffixes, one node (the root).
+    state = np.array([0, -1, 0, 0, 1], dtype=np.int64)
+    for pos in range(len(text_arr)):
+        _flat_extend(text_arr, pos, start, end, is_leaf, suffix_link,
+                                 first_child, next_sibling, state)
+    return start, end, is_leaf, suffix_link, first_child, next_sibling, int(state[4])
+
+
 # =========================
 # Example Usage:
 # =========================